@@ -0,0 +1,131 @@
+"""
+End-to-end benchmark for contract ranking over the transaction store.
+
+Builds a synthetic TransactionStore (seeded, so runs are reproducible) or uses
+an existing one, then times the read of the graph columns, the wallet ->
+contract graph build and rank_contracts separately, and fails if the total
+exceeds the budget. Store generation is timed but not counted in the total.
+
+Contract popularity follows a Zipf distribution, so a few contracts are used
+by most wallets and a long tail by a handful, as on the scraped corpus.
+
+The analytics log goes to analytics_ranking.log in the system temp directory.
+
+Usage: python benchmarks/analytics_ranking.py [--wallets 43000] [--transactions 2000000] [--budget-s 60]
+       python benchmarks/analytics_ranking.py --db transactions.db
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'scrapping'))
+
+# settings.py writes scrapper.log into the current directory; configure logging
+# first so its basicConfig is a no-op and the tree stays clean
+LOG_FILE = os.path.join(tempfile.gettempdir(), 'analytics_ranking.log')
+logging.basicConfig(filename=LOG_FILE, level=logging.INFO)
+
+from analytics import GRAPH_COLUMNS, InteractionGraph, rank_contracts  # noqa: E402
+from transaction_store import STORE_COLUMNS, TransactionStore  # noqa: E402
+
+METHODS = ('Transfer', 'Swap', 'Deposit', 'Withdraw', 'Claim', 'Mint', 'Approve', 'Execute')
+METHOD_WEIGHTS = (0.3, 0.25, 0.1, 0.08, 0.07, 0.05, 0.1, 0.05)
+SECONDS_PER_YEAR = 365 * 86400
+BATCH_SIZE = 200_000
+
+
+def hex_addresses(prefix: int, count: int) -> np.ndarray:
+    """Deterministic 0x-prefixed 40-digit addresses."""
+    return np.array([f'0x{prefix:08x}{i:032x}' for i in range(count)], dtype=object)
+
+
+def build_store(db_path: str, wallets: int, contracts: int, transactions: int, seed: int) -> TransactionStore:
+    """Fill a new store with synthetic outgoing transactions."""
+    rng = np.random.default_rng(seed)
+    wallet_addresses = hex_addresses(1, wallets)
+    contract_addresses = hex_addresses(2, contracts)
+    store = TransactionStore(db_path)
+    now = int(time.time())
+
+    for start in range(0, transactions, BATCH_SIZE):
+        size = min(BATCH_SIZE, transactions - start)
+        wallet_ids = rng.integers(0, wallets, size)
+        contract_ids = np.minimum(rng.zipf(1.3, size) - 1, contracts - 1)
+        method_ids = rng.choice(len(METHODS), size, p=METHOD_WEIGHTS)
+        timestamps = now - rng.integers(0, SECONDS_PER_YEAR, size)
+        txhashes = [f'0x{i:064x}' for i in range(start, start + size)]
+
+        columns = {
+            'txhash': txhashes,
+            'address': wallet_addresses[wallet_ids],
+            'block': (timestamps // 12).tolist(),
+            'timestamp': timestamps.tolist(),
+            'from_address': wallet_addresses[wallet_ids],
+            'to_address': contract_addresses[contract_ids],
+            'method': np.array(METHODS, dtype=object)[method_ids],
+        }
+        records = zip(*(columns.get(column, [None] * size) for column in STORE_COLUMNS))
+        with store.lock, store.connection:
+            store.connection.executemany(
+                f"INSERT OR IGNORE INTO transactions ({', '.join(STORE_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(STORE_COLUMNS))})",
+                records
+            )
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help='Existing transactions.db to rank instead of a synthetic store')
+    parser.add_argument('--wallets', type=int, default=43000)
+    parser.add_argument('--contracts', type=int, default=20000)
+    parser.add_argument('--transactions', type=int, default=2_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--top-n', type=int, default=100)
+    parser.add_argument('--budget-s', type=float, default=60.0,
+                        help='Maximum allowed read + graph + ranking time')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        start = time.perf_counter()
+        if args.db:
+            store = TransactionStore(args.db)
+        else:
+            store = build_store(os.path.join(tmp_dir, 'transactions.db'),
+                                args.wallets, args.contracts, args.transactions, args.seed)
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        transactions = store.read_transactions(columns=GRAPH_COLUMNS, ordered=False)
+        read_s = time.perf_counter() - start
+        store.close()
+
+        start = time.perf_counter()
+        graph = InteractionGraph.from_transactions(transactions)
+        graph_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ranking = rank_contracts(graph, top_n=args.top_n)
+        rank_s = time.perf_counter() - start
+
+    total_s = read_s + graph_s + rank_s
+    print(f"Store:   {len(transactions)} transactions, {len(graph.wallets)} wallets, "
+          f"{len(graph.contracts)} contracts, {graph.adjacency.nnz} edges")
+    print(f"Build:   {build_s:.2f} s ({'opened ' + args.db if args.db else 'synthetic, not counted'})")
+    print(f"Read:    {read_s:.2f} s")
+    print(f"Graph:   {graph_s:.2f} s")
+    print(f"Ranking: {rank_s:.2f} s ({len(ranking)} contracts)")
+    print(f"Total:   {total_s:.2f} s (budget {args.budget_s:.0f} s)")
+
+    if total_s > args.budget_s:
+        sys.exit(f"FAIL: store -> ranking took {total_s:.2f} s, budget is {args.budget_s:.0f} s")
+
+
+if __name__ == '__main__':
+    main()
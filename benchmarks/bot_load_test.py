@@ -0,0 +1,313 @@
+"""
+Load test for bot.py against a local fake Telegram Bot API server.
+
+The fake server implements getUpdates (long polling), sendPhoto, sendMessage,
+deleteMessage and answerCallbackQuery with a configurable response latency.
+Simulated users press "Посмотреть рекомендации" and then page through the
+protocol cards using the inline buttons returned by the bot.
+
+Reported metrics: handler throughput, end-to-end p50/p99 latency (update
+enqueued -> last API call of the handler), failed interactions (the handler
+raised) and timed-out ones (no completing call within --interaction-timeout;
+the user stops there), outbound API calls per
+interaction, the size of the per-user state and whole-process peak RSS
+growth (bot, fake server and simulated users share one process).
+
+The bot log goes to bot_load_test.log in the system temp directory.
+
+Usage: python benchmarks/bot_load_test.py [--users 1000] [--pages 5] [--api-latency-ms 50]
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import resource
+import argparse
+import tempfile
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Optional
+
+from aiohttp import web
+from aiogram.bot.api import TelegramAPIServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# settings.py writes bot.log into the current directory; configure logging
+# first so its basicConfig is a no-op and the tree stays clean
+LOG_FILE = os.path.join(tempfile.gettempdir(), 'bot_load_test.log')
+logging.basicConfig(filename=LOG_FILE, level=logging.INFO)
+
+import bot  # noqa: E402
+
+TOKEN = '123456789:load-test-token'
+RECOMMENDATIONS_TEXT = 'Посмотреть рекомендации'
+
+
+class Interaction:
+    """One user action: an update sent to the bot and the API calls it caused."""
+
+    def __init__(self, kind: str, completes_on: str):
+        self.kind = kind
+        self.completes_on = completes_on  # API method that finishes the handler
+        self.started_at = time.perf_counter()
+        self.calls = 0
+        self.card: Optional[dict] = None  # Last card sent to the user
+        self.latency: Optional[float] = None
+        self.status = 'pending'  # 'ok', 'failed' or 'timeout'
+        self.done = asyncio.get_running_loop().create_future()
+
+    def finish(self, status: str):
+        if not self.done.done():
+            self.status = status
+            self.latency = time.perf_counter() - self.started_at
+            self.done.set_result(status)
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait for the handler to finish; return True if it completed successfully."""
+        try:
+            await asyncio.wait_for(asyncio.shield(self.done), timeout)
+        except asyncio.TimeoutError:
+            self.status = 'timeout'
+        return self.status == 'ok'
+
+
+class FakeBotAPI:
+    """
+    Minimal Telegram Bot API: queues updates for getUpdates and answers the
+    methods used by bot.py after a configurable delay.
+    """
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.updates: List[dict] = []
+        self.new_updates = asyncio.Event()
+        self.next_update_id = 1
+        self.next_message_id = 1
+        self.pending: Dict[int, Interaction] = {}  # chat_id -> current interaction
+        self.callbacks: Dict[str, int] = {}  # callback_query_id -> chat_id
+        self.calls = Counter()
+        self.unattributed_calls = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route('POST', '/bot{token}/{method}', self.handle)
+        return app
+
+    def push_update(self, chat_id: int, interaction: Interaction, payload: dict):
+        update_id = self.next_update_id
+        self.next_update_id += 1
+        self.pending[chat_id] = interaction
+        self.updates.append({'update_id': update_id, **payload})
+        self.new_updates.set()
+        return update_id
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info['method'].lower()
+        params = dict(await request.post())
+        self.calls[method] += 1
+        if method == 'getupdates':
+            return await self.get_updates(params)
+
+        await asyncio.sleep(self.latency)
+        chat_id = params.get('chat_id')
+        if chat_id is None and 'callback_query_id' in params:
+            chat_id = self.callbacks.pop(params['callback_query_id'], None)
+        interaction = self.pending.get(int(chat_id)) if chat_id is not None else None
+
+        result = True
+        if method in ('sendphoto', 'sendmessage'):
+            result = self.make_message(int(chat_id), params.get('reply_markup'))
+        if interaction is None:
+            self.unattributed_calls += 1
+            return web.json_response({'ok': True, 'result': result})
+
+        interaction.calls += 1
+        if method == 'sendphoto':
+            interaction.card = result
+        if method == interaction.completes_on:
+            interaction.finish('ok')
+        return web.json_response({'ok': True, 'result': result})
+
+    async def get_updates(self, params: dict) -> web.Response:
+        offset = int(params.get('offset') or 0)
+        limit = int(params.get('limit') or 100)
+        self.updates = [update for update in self.updates if update['update_id'] >= offset]
+        if not self.updates:
+            self.new_updates.clear()
+            try:
+                await asyncio.wait_for(self.new_updates.wait(), float(params.get('timeout') or 0))
+            except asyncio.TimeoutError:
+                pass
+        return web.json_response({'ok': True, 'result': self.updates[:limit]})
+
+    async def on_handler_error(self, update, exception) -> bool:
+        """Dispatcher errors handler: mark the interaction of the update as failed."""
+        user = update.message.from_user if update.message else update.callback_query.from_user
+        interaction = self.pending.get(user.id)
+        if interaction is not None:
+            interaction.finish('failed')
+        return True
+
+    def make_message(self, chat_id: int, reply_markup: Optional[str]) -> dict:
+        message_id = self.next_message_id
+        self.next_message_id += 1
+        message = {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'photo': [{'file_id': 'photo', 'file_unique_id': 'photo', 'width': 1, 'height': 1}],
+        }
+        if reply_markup:
+            message['reply_markup'] = json.loads(reply_markup)
+        return message
+
+
+def user_payload(chat_id: int) -> dict:
+    return {'id': chat_id, 'is_bot': False, 'first_name': f'user{chat_id}'}
+
+
+async def simulate_user(
+    api: FakeBotAPI, chat_id: int, pages: int, think_time: float, timeout: float, results: List[Interaction]
+):
+    """
+    Open the recommendations and page through the cards using the inline buttons.
+    The user stops at the first interaction that fails or times out.
+    """
+    interaction = Interaction('open', completes_on='sendphoto')
+    api.push_update(chat_id, interaction, {'message': {
+        'message_id': 0, 'date': int(time.time()), 'text': RECOMMENDATIONS_TEXT,
+        'chat': {'id': chat_id, 'type': 'private'}, 'from': user_payload(chat_id),
+    }})
+    results.append(interaction)
+    if not await interaction.wait(timeout):
+        return
+
+    for _ in range(pages):
+        if think_time:
+            await asyncio.sleep(random.uniform(0, 2 * think_time))
+        card = interaction.card
+        buttons = [button for row in card.get('reply_markup', {}).get('inline_keyboard', []) for button in row]
+        if not buttons:
+            break
+        # Prefer paging forward, go back at the end of the catalog
+        button = next((b for b in buttons if b['callback_data'].startswith('next_')), buttons[0])
+
+        interaction = Interaction('page', completes_on='answercallbackquery')
+        callback_id = f'{chat_id}-{api.next_update_id}'
+        api.callbacks[callback_id] = chat_id
+        api.push_update(chat_id, interaction, {'callback_query': {
+            'id': callback_id, 'from': user_payload(chat_id), 'chat_instance': str(chat_id),
+            'data': button['callback_data'], 'message': card,
+        }})
+        results.append(interaction)
+        if not await interaction.wait(timeout):
+            return
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else float('nan')
+
+
+def report(results: List[Interaction], api: FakeBotAPI, elapsed: float, memory: dict):
+    statuses = Counter(r.status for r in results)
+    print(f"interactions:        {len(results)} in {elapsed:.2f} s "
+          f"(ok={statuses['ok']}, failed={statuses['failed']}, timeout={statuses['timeout']})")
+    print(f"handler throughput:  {statuses['ok'] / elapsed:.1f} successful interactions/s")
+    for kind in ('open', 'page', None):
+        selected = [r for r in results if kind is None or r.kind == kind]
+        latencies = [r.latency * 1000 for r in selected if r.status == 'ok']
+        failed = sum(r.status == 'failed' for r in selected)
+        timed_out = sum(r.status == 'timeout' for r in selected)
+        if latencies:
+            print(f"latency {kind or 'all':<5}        p50 {percentile(latencies, 0.5):.1f} ms, "
+                  f"p99 {percentile(latencies, 0.99):.1f} ms, max {max(latencies):.1f} ms, "
+                  f"failed {failed}, timeout {timed_out}")
+        elif selected:
+            print(f"latency {kind or 'all':<5}        no successful interactions, "
+                  f"failed {failed}, timeout {timed_out}")
+    outbound = {method: count for method, count in api.calls.items() if method != 'getupdates'}
+    print(f"API calls/interaction: {sum(r.calls for r in results) / max(len(results), 1):.2f} "
+          f"({', '.join(f'{m}={c}' for m, c in sorted(outbound.items()))}, "
+          f"getupdates={api.calls['getupdates']}, unattributed={api.unattributed_calls})")
+    print(f"per-user state:      {memory['users']} entries in user_positions, "
+          f"{memory['state_bytes'] / 1024:.1f} KiB "
+          f"({memory['state_bytes'] / max(memory['users'], 1):.0f} B per user)")
+    print(f"process RSS growth:  {memory['rss_growth_bytes'] / 1024:.1f} KiB peak "
+          f"(whole process: bot, fake API server and simulated users)")
+    if memory['traced_bytes'] is not None:
+        print(f"traced allocations:  {memory['traced_bytes'] / 1024:.1f} KiB still alive after the run")
+
+
+async def run(args):
+    api = FakeBotAPI(latency=args.api_latency_ms / 1000)
+    runner = web.AppRunner(api.app())
+    await runner.setup()
+    # Handlers stuck in the fake API must not hold up shutdown after a timed-out run
+    site = web.TCPSite(runner, '127.0.0.1', args.port, shutdown_timeout=1.0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    bot.load_protocols(args.catalog)
+    dp = bot.create_dispatcher(TOKEN, server=TelegramAPIServer.from_base(f'http://127.0.0.1:{port}'))
+    dp.register_errors_handler(api.on_handler_error)
+    polling = asyncio.create_task(dp.start_polling())
+
+    # tracemalloc slows down allocations noticeably, so it is opt-in
+    if args.trace_memory:
+        tracemalloc.start()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results: List[Interaction] = []
+    semaphore = asyncio.Semaphore(args.concurrency or args.users)
+
+    async def limited_user(chat_id: int):
+        async with semaphore:
+            await simulate_user(
+                api, chat_id, args.pages, args.think_time_ms / 1000, args.interaction_timeout, results
+            )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(limited_user(chat_id) for chat_id in range(1, args.users + 1)))
+    elapsed = time.perf_counter() - start
+
+    memory = {
+        'users': len(bot.user_positions),
+        'state_bytes': sys.getsizeof(bot.user_positions)
+        + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in bot.user_positions.items()),
+        'rss_growth_bytes': (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) * 1024,
+        'traced_bytes': tracemalloc.get_traced_memory()[0] if args.trace_memory else None,
+    }
+    tracemalloc.stop()
+    report(results, api, elapsed, memory)
+
+    dp.stop_polling()
+    polling.cancel()
+    await asyncio.gather(polling, return_exceptions=True)
+    session = await dp.bot.get_session()
+    await session.close()
+    await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--pages', type=int, default=5, help='Cards each user pages through after opening')
+    parser.add_argument('--api-latency-ms', type=float, default=50.0, help='Fake Bot API response delay')
+    parser.add_argument('--think-time-ms', type=float, default=0.0, help='Mean pause between user actions')
+    parser.add_argument('--concurrency', type=int, default=0, help='Simultaneously active users (0 = all)')
+    parser.add_argument('--interaction-timeout', type=float, default=30.0,
+                        help='Seconds to wait for a handler before counting the interaction as timed out')
+    parser.add_argument('--trace-memory', action='store_true', help='Track live allocations with tracemalloc')
+    parser.add_argument('--port', type=int, default=0, help='Fake Bot API port (0 = random)')
+    parser.add_argument('--catalog', default=os.path.join(REPO_ROOT, 'scrapped_info.json'))
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Startup-time benchmark for bot.py.
+
+Imports the bot module in fresh interpreters, measures import time, catalog
+loading time and peak RSS, and fails if heavy scraping dependencies leak into
+the bot process or the import budget is exceeded.
+
+Usage: python benchmarks/bot_startup.py [--runs 10] [--budget-ms 1500]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the bot process must never import
+FORBIDDEN_MODULES = ('pandas', 'numpy', 'selenium', 'yadisk')
+
+PROBE = """
+import json, sys, time, resource
+start = time.perf_counter()
+import bot
+import_ms = (time.perf_counter() - start) * 1000
+start = time.perf_counter()
+bot.load_protocols({catalog!r})
+catalog_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{
+    'import_ms': import_ms,
+    'catalog_ms': catalog_ms,
+    'protocols': len(bot.protocols),
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'forbidden': sorted(m for m in {forbidden!r} if m in sys.modules),
+}}))
+"""
+
+
+def run_probe(catalog: str) -> dict:
+    """Import the bot in a fresh interpreter and return the probe measurements."""
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    code = PROBE.format(catalog=catalog, forbidden=FORBIDDEN_MODULES)
+    # Run outside the repo so settings.py does not write bot.log into the tree
+    with tempfile.TemporaryDirectory() as cwd:
+        output = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=cwd, env=env, capture_output=True, text=True, check=True
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--budget-ms', type=float, default=1500.0,
+                        help='Maximum allowed median import time of bot.py')
+    parser.add_argument('--catalog', default=os.path.join(REPO_ROOT, 'scrapped_info.json'))
+    args = parser.parse_args()
+
+    results = [run_probe(args.catalog) for _ in range(args.runs)]
+    import_ms = [r['import_ms'] for r in results]
+    catalog_ms = [r['catalog_ms'] for r in results]
+    forbidden = sorted({m for r in results for m in r['forbidden']})
+
+    print(f"runs:            {args.runs}")
+    print(f"import bot:      median {statistics.median(import_ms):.1f} ms, max {max(import_ms):.1f} ms")
+    print(f"load catalog:    median {statistics.median(catalog_ms):.1f} ms ({results[0]['protocols']} protocols)")
+    print(f"peak RSS:        {max(r['max_rss_kb'] for r in results) / 1024:.1f} MiB")
+    print(f"heavy modules:   {', '.join(forbidden) or 'none'}")
+
+    failed = False
+    if forbidden:
+        print(f"FAIL: bot imports heavy modules: {', '.join(forbidden)}")
+        failed = True
+    if statistics.median(import_ms) > args.budget_ms:
+        print(f"FAIL: median import time exceeds budget of {args.budget_ms:.0f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
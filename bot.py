@@ -1,41 +1,38 @@
 
 import os
 import random
+import asyncio
 import mimetypes
+from typing import List
 from settings import logger
-from scrapping.debank_scrapper import parse_scrapped_info
+from scrapping.catalog import parse_scrapped_info
 from dotenv import load_dotenv
 from aiogram import Bot, Dispatcher, types
+from aiogram.bot.api import TelegramAPIServer, TELEGRAM_PRODUCTION
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from aiogram.utils import executor
 
-# Initialize bot and dispatcher
-load_dotenv(".env")
-bot = Bot(token=os.getenv('TELEGRAM_BOT_TOKEN'))
-dp = Dispatcher(bot)
+CATALOG_FILE = 'scrapped_info.json'
 
 # Dictionary to store current position for each user
 user_positions = {}
-protocols = parse_scrapped_info('scrapped_info.json')
+# Protocols are loaded on startup, not at import time
+protocols: List[dict] = []
 
 # Main menu keyboard
 main_menu = types.ReplyKeyboardMarkup(resize_keyboard=True)
 main_menu.add(types.KeyboardButton('Посмотреть рекомендации'))
 main_menu.add(types.KeyboardButton('Информация о проекте'))
 
-@dp.message_handler(commands=['start'])
 async def send_welcome(message: types.Message):
     await message.reply("Добро пожаловать в бот рекомендаций протоколов!", reply_markup=main_menu)
 
-@dp.message_handler(lambda message: message.text == 'Посмотреть рекомендации')
 async def show_recommendations(message: types.Message):
     global protocols
     random.shuffle(protocols)
     user_id = message.from_user.id
     user_positions[user_id] = 0  # Start with first protocol
-    await display_protocol_card(message.chat.id, user_id)
+    await display_protocol_card(message.bot, message.chat.id, user_id)
 
-@dp.message_handler(lambda message: message.text == 'Информация о проекте')
 async def show_project_info(message: types.Message):
     info_text = (
         "🤖 <b>Бот рекомендаций протоколов</b>\n\n"
@@ -50,7 +47,7 @@ async def show_project_info(message: types.Message):
     )
     await message.answer(info_text, parse_mode='HTML')
 
-async def display_protocol_card(chat_id, user_id):
+async def display_protocol_card(bot: Bot, chat_id, user_id):
     position = user_positions.get(user_id, 0)
     protocol = protocols[position]
     
@@ -93,8 +90,8 @@ async def display_protocol_card(chat_id, user_id):
         reply_markup=keyboard
     )
 
-@dp.callback_query_handler(lambda c: c.data.startswith(('prev_', 'next_')))
 async def process_callback(callback_query: types.CallbackQuery):
+    bot = callback_query.bot
     user_id = callback_query.from_user.id
     action, current_pos = callback_query.data.split('_')
     current_pos = int(current_pos)
@@ -114,10 +111,44 @@ async def process_callback(callback_query: types.CallbackQuery):
     )
     
     # Display new protocol card
-    await display_protocol_card(callback_query.message.chat.id, user_id)
+    await display_protocol_card(bot, callback_query.message.chat.id, user_id)
     
     # Answer callback query to remove loading indicator
     await bot.answer_callback_query(callback_query.id)
 
+def create_dispatcher(token: str, server: TelegramAPIServer = TELEGRAM_PRODUCTION) -> Dispatcher:
+    """
+    Create the bot and dispatcher and register all handlers.
+
+    :param token: Telegram bot token
+    :param server: Bot API server, e.g. a local fake server for load tests
+    :return: Dispatcher bound to a new Bot instance
+    """
+    bot = Bot(token=token, server=server)
+    dp = Dispatcher(bot)
+    dp.register_message_handler(send_welcome, commands=['start'])
+    dp.register_message_handler(show_recommendations, lambda message: message.text == 'Посмотреть рекомендации')
+    dp.register_message_handler(show_project_info, lambda message: message.text == 'Информация о проекте')
+    dp.register_callback_query_handler(process_callback, lambda c: c.data.startswith(('prev_', 'next_')))
+    return dp
+
+def load_protocols(file_path: str = CATALOG_FILE):
+    global protocols
+    protocols = parse_scrapped_info(file_path)
+    logger.info(f"Loaded {len(protocols)} protocols from {file_path}")
+
+async def main():
+    load_dotenv(".env")
+    dp = create_dispatcher(os.getenv('TELEGRAM_BOT_TOKEN'))
+    load_protocols()
+    try:
+        await dp.skip_updates()
+        await dp.start_polling()
+    finally:
+        await dp.storage.close()
+        await dp.storage.wait_closed()
+        session = await dp.bot.get_session()
+        await session.close()
+
 if __name__ == '__main__':
-    executor.start_polling(dp, skip_updates=True)
+    asyncio.run(main())
@@ -0,0 +1,232 @@
+import time
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from typing import Iterable, List, Optional, Set
+
+from settings import logger
+
+# Методы, которые не говорят об использовании протокола (как в read_addresses_from_csv)
+EXCLUDED_METHODS = ('Approve', 'Execute')
+
+SECONDS_PER_DAY = 86400
+
+# Колонки TransactionStore, нужные для построения графа
+GRAPH_COLUMNS = ['address', 'to_address', 'method', 'timestamp']
+
+RANKING_COLUMNS = [
+    'contract', 'wallets', 'transactions', 'recency',
+    'top_method', 'top_method_share', 'methods', 'co_used_with',
+]
+
+
+class InteractionGraph:
+    """
+    Двудольный граф кошелёк → контракт, построенный по нормализованным транзакциям.
+
+    Кошельки и контракты закодированы целыми ID (индексы в self.wallets и
+    self.contracts), смежность хранится в CSR-матрице wallets × contracts,
+    значения которой — количество транзакций кошелька с контрактом.
+    """
+
+    def __init__(
+        self,
+        wallets: np.ndarray,
+        contracts: np.ndarray,
+        methods: np.ndarray,
+        adjacency: csr_matrix,
+        contract_ids: np.ndarray,
+        method_ids: np.ndarray,
+        timestamps: np.ndarray
+    ):
+        self.wallets = wallets
+        self.contracts = contracts
+        self.methods = methods
+        self.adjacency = adjacency
+        # Рёбра на уровне отдельных транзакций, нужны для взвешивания по времени
+        self.contract_ids = contract_ids
+        self.method_ids = method_ids
+        self.timestamps = timestamps
+
+    @classmethod
+    def from_transactions(
+        cls,
+        transactions: pd.DataFrame,
+        excluded_methods: Iterable[str] = EXCLUDED_METHODS
+    ) -> "InteractionGraph":
+        """
+        Строит граф по DataFrame в схеме TransactionStore.
+
+        Учитываются только исходящие вызовы: транзакции, у которых получатель
+        отличается от самого кошелька.
+
+        :param transactions: DataFrame с колонками address, to_address, method, timestamp
+        :param excluded_methods: Методы, транзакции с которыми не учитываются
+        :return: Граф взаимодействий
+        """
+        mask = transactions['to_address'].notna() & (transactions['to_address'] != transactions['address'])
+        excluded_methods = list(excluded_methods)
+        if excluded_methods:
+            mask &= ~transactions['method'].isin(excluded_methods)
+        data = transactions[mask]
+
+        wallet_ids, wallets = pd.factorize(data['address'])
+        contract_ids, contracts = pd.factorize(data['to_address'])
+        method_ids, methods = pd.factorize(data['method'].fillna('Unknown'))
+
+        # Повторяющиеся пары (кошелёк, контракт) суммируются при построении CSR
+        adjacency = csr_matrix(
+            (np.ones(len(data), dtype=np.int32), (wallet_ids, contract_ids)),
+            shape=(len(wallets), len(contracts))
+        )
+        timestamps = pd.to_numeric(data['timestamp'], errors='coerce').to_numpy(dtype=np.float64)
+
+        logger.info(f"Built interaction graph: {len(wallets)} wallets, {len(contracts)} contracts, "
+                    f"{adjacency.nnz} edges from {len(data)} transactions.")
+        return cls(
+            np.asarray(wallets), np.asarray(contracts), np.asarray(methods),
+            adjacency, contract_ids, method_ids, timestamps
+        )
+
+    @property
+    def incidence(self) -> csr_matrix:
+        """Бинарная матрица wallets × contracts: 1, если кошелёк вызывал контракт."""
+        incidence = self.adjacency.copy()
+        incidence.data = np.ones_like(incidence.data)
+        return incidence
+
+    def reach(self) -> np.ndarray:
+        """Количество уникальных кошельков для каждого контракта."""
+        return self.adjacency.getnnz(axis=0)
+
+    def activity(self) -> np.ndarray:
+        """Количество транзакций для каждого контракта."""
+        return np.asarray(self.adjacency.sum(axis=0)).ravel()
+
+    def recency_weighted_activity(self, half_life_days: float = 30.0) -> np.ndarray:
+        """
+        Активность контрактов с экспоненциальным затуханием по возрасту транзакций.
+
+        :param half_life_days: Период полураспада веса транзакции в днях
+        :return: Сумма весов транзакций для каждого контракта
+        """
+        reference = np.nanmax(self.timestamps) if np.isfinite(self.timestamps).any() else 0.0
+        age_days = (reference - self.timestamps) / SECONDS_PER_DAY
+        weights = np.nan_to_num(np.exp2(-age_days / half_life_days), nan=0.0)
+        return np.bincount(self.contract_ids, weights=weights, minlength=len(self.contracts))
+
+    def method_matrix(self) -> csr_matrix:
+        """CSR-матрица contracts × methods с количеством вызовов каждого метода."""
+        return csr_matrix(
+            (np.ones(len(self.contract_ids), dtype=np.int32), (self.contract_ids, self.method_ids)),
+            shape=(len(self.contracts), len(self.methods))
+        )
+
+    def co_usage(self, contract_ids: np.ndarray, top_k: int = 3) -> List[List[str]]:
+        """
+        Контракты, которыми чаще всего пользуются те же кошельки.
+
+        Считается только для переданных контрактов: матрица совместного использования
+        строится как B[:, ids]^T · B, где B — бинарная матрица инцидентности.
+
+        :param contract_ids: ID контрактов, для которых ищутся соседи
+        :param top_k: Количество соседей для каждого контракта
+        :return: Списки адресов соседей, упорядоченные по числу общих кошельков
+        """
+        incidence = self.incidence.tocsc()
+        co_counts = (incidence[:, contract_ids].T @ incidence).tocsr()
+        # Исключаем совпадение контракта с самим собой
+        co_counts[np.arange(len(contract_ids)), contract_ids] = 0
+        co_counts.eliminate_zeros()
+
+        partners = []
+        for row_id in range(co_counts.shape[0]):
+            start, end = co_counts.indptr[row_id], co_counts.indptr[row_id + 1]
+            indices, counts = co_counts.indices[start:end], co_counts.data[start:end]
+            top = indices[np.argsort(-counts, kind='stable')[:top_k]]
+            partners.append(self.contracts[top].tolist())
+        return partners
+
+
+def rank_contracts(
+    graph: InteractionGraph,
+    top_n: int = 100,
+    half_life_days: float = 30.0,
+    co_usage_k: int = 3
+) -> pd.DataFrame:
+    """
+    Ранжирует контракты по числу уникальных кошельков и активности с учётом давности.
+
+    :param graph: Граф взаимодействий
+    :param top_n: Количество контрактов в рейтинге
+    :param half_life_days: Период полураспада для recency-weighted активности
+    :param co_usage_k: Количество контрактов в колонке co_used_with
+    :return: DataFrame с колонками contract, wallets, transactions, recency,
+        top_method, top_method_share, methods, co_used_with
+    """
+    start_time = time.time()
+    if len(graph.contracts) == 0 or top_n <= 0:
+        return pd.DataFrame(columns=RANKING_COLUMNS)
+
+    reach = graph.reach()
+    recency = graph.recency_weighted_activity(half_life_days)
+
+    # Сортировка по охвату, при равенстве — по свежей активности
+    order = np.lexsort((-recency, -reach))[:top_n]
+
+    methods = graph.method_matrix()[order]
+    top_method = np.asarray(methods.argmax(axis=1)).ravel()
+    method_totals = np.asarray(methods.sum(axis=1)).ravel()
+    top_method_counts = np.asarray(methods.max(axis=1).todense()).ravel()
+
+    ranking = pd.DataFrame({
+        'contract': graph.contracts[order],
+        'wallets': reach[order],
+        'transactions': graph.activity()[order],
+        'recency': recency[order],
+        'top_method': graph.methods[top_method],
+        'top_method_share': top_method_counts / np.maximum(method_totals, 1),
+        'methods': methods.getnnz(axis=1),
+        'co_used_with': graph.co_usage(order, co_usage_k),
+    })
+    logger.info(f"Ranked {len(graph.contracts)} contracts in {time.time() - start_time:.2f} seconds.")
+    return ranking
+
+
+def candidate_addresses(ranking: pd.DataFrame, min_wallets: int = 1) -> Set[str]:
+    """
+    Адреса контрактов из рейтинга для DeBankScrapper, который наполняет scrapped_info.json.
+
+    :param ranking: Результат rank_contracts
+    :param min_wallets: Минимальное количество уникальных кошельков
+    :return: Набор HEX-адресов контрактов
+    """
+    return set(ranking.loc[ranking['wallets'] >= min_wallets, 'contract'])
+
+
+def rank_store_contracts(store, addresses: Optional[Iterable[str]] = None, **kwargs) -> pd.DataFrame:
+    """
+    Читает транзакции из TransactionStore и ранжирует контракты.
+
+    :param store: Экземпляр TransactionStore
+    :param addresses: Кошельки для анализа; если не указаны, используется весь корпус
+    :return: Результат rank_contracts
+    """
+    start_time = time.time()
+    transactions = store.read_transactions(addresses, columns=GRAPH_COLUMNS, ordered=False)
+    logger.info(f"Read {len(transactions)} transactions in {time.time() - start_time:.2f} seconds.")
+    return rank_contracts(InteractionGraph.from_transactions(transactions), **kwargs)
+
+
+if __name__ == "__main__":
+    from transaction_store import TransactionStore
+
+    store = TransactionStore("transactions.db")
+    ranking = rank_store_contracts(store)
+    ranking.to_csv("top_contracts.csv", index=False)
+    for row in ranking.itertuples(index=False):
+        print(f"Contract: {row.contract}, Wallets: {row.wallets}, Recency: {row.recency:.2f}, "
+              f"Method: {row.top_method} ({row.top_method_share:.0%})")
+        print(f"Co-used with: {', '.join(row.co_used_with)}")
+        print("-" * 40)
+    store.close()
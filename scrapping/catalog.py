@@ -0,0 +1,34 @@
+import json
+from typing import List
+
+
+def parse_scrapped_info(file_path: str) -> List[dict]:
+    """
+    Функция парсит scrapped_info.json и преобразует данные в новую схему protocols.
+
+    Модуль не зависит от pandas и selenium, поэтому бот импортирует его напрямую.
+
+    :param file_path: Путь к JSON-файлу
+    :return: Список протоколов в новой схеме
+    """
+    with open(file_path, 'r') as f:
+        scrapped_info = json.load(f)
+    
+    protocols = []
+    for hex_address, info in scrapped_info.items():
+        # Извлечение данных
+        tag = info.get('tag', info.get('username', 'Unknown'))
+        image_url = info.get('image_url', 'https://cryptologos.cc/logos/ethereum-eth-logo.png')
+        name = tag.split(':')[1] if ':' in tag else info.get('username', 'Unknown')
+        
+        # Формирование объекта протокола
+        protocol = {
+            'name': name,
+            'hex_address': hex_address,
+            'description': f'{tag} - No additional description available.',
+            'url': f'https://debank.com/profile/{hex_address}',
+            'image_url': image_url
+        }
+        protocols.append(protocol)
+    
+    return protocols
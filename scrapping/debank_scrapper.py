@@ -1,11 +1,8 @@
-import pandas as pd
 import json
 import os
-from selenium import webdriver
 from typing import Set, List, Optional
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+
+# pandas и selenium импортируются внутри функций: модуль можно импортировать без них
 
 class DeBankScrapper:
     def __init__(self, driver, cache_file: Optional[str] = None):
@@ -13,6 +10,10 @@ class DeBankScrapper:
         self.cache_file = cache_file
 
     def get_info(self, scrapped_addresses: Set[str]) -> dict:
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
         if (self.cache_file is not None):
             try:
                 with open(self.cache_file, 'r') as f:
@@ -64,35 +65,6 @@ class DeBankScrapper:
 
         return scrapped_info
 
-def parse_scrapped_info(file_path: str) -> List[dict]:
-    """
-    Функция парсит scrapped_info.json и преобразует данные в новую схему protocols.
-
-    :param file_path: Путь к JSON-файлу
-    :return: Список протоколов в новой схеме
-    """
-    with open(file_path, 'r') as f:
-        scrapped_info = json.load(f)
-    
-    protocols = []
-    for hex_address, info in scrapped_info.items():
-        # Извлечение данных
-        tag = info.get('tag', info.get('username', 'Unknown'))
-        image_url = info.get('image_url', 'https://cryptologos.cc/logos/ethereum-eth-logo.png')
-        name = tag.split(':')[1] if ':' in tag else info.get('username', 'Unknown')
-        
-        # Формирование объекта протокола
-        protocol = {
-            'name': name,
-            'hex_address': hex_address,
-            'description': f'{tag} - No additional description available.',
-            'url': f'https://debank.com/profile/{hex_address}',
-            'image_url': image_url
-        }
-        protocols.append(protocol)
-    
-    return protocols
-
 def read_addresses_from_csv(file_path: str, threshold_operations = 10) -> List[str]:
     """
     Функция читает CSV-файл с помощью pandas и извлекает уникальные адреса из колонки '.To'.
@@ -100,6 +72,8 @@ def read_addresses_from_csv(file_path: str, threshold_operations = 10) -> List[s
     :param file_path: Путь к CSV-файлу
     :return: Список уникальных адресов из колонки '.To'
     """
+    import pandas as pd
+
     try:
         # Чтение CSV-файла
         data = pd.read_csv(file_path)
@@ -123,9 +97,31 @@ def read_addresses_from_csv(file_path: str, threshold_operations = 10) -> List[s
         return []
 
 if __name__ == "__main__":
+    from selenium import webdriver
+
     file_path = "dataset/etherium/full_data.csv"
+    store_path = "transactions.db"
     cache_file = "scrapped_info.json"
-    topInteractions = read_addresses_from_csv(file_path)
+    # Минимальное количество уникальных кошельков, как threshold_operations в read_addresses_from_csv
+    min_wallets = 10
+    topInteractions = []
+    if os.path.exists(store_path):
+        # Кандидаты из рейтинга контрактов по хранилищу транзакций:
+        # ((адрес, основной метод), количество уникальных кошельков)
+        from analytics import candidate_addresses, rank_store_contracts
+        from transaction_store import TransactionStore
+
+        store = TransactionStore(store_path)
+        ranking = rank_store_contracts(store)
+        store.close()
+        candidates = candidate_addresses(ranking, min_wallets=min_wallets)
+        topInteractions = [
+            ((row.contract, row.top_method), row.wallets)
+            for row in ranking.itertuples(index=False)
+            if row.contract in candidates
+        ]
+    if not topInteractions:
+        topInteractions = read_addresses_from_csv(file_path)
     scrapped_addresses = set()
     for (address, _type), count in topInteractions:
         print(f"Address: {address}, Count: {count}, Type: {_type}")
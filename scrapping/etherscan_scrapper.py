@@ -1,9 +1,7 @@
 import shutil
-import aiohttp
 import asyncio
 import pandas as pd
 from typing import List, Tuple, Optional
-from tqdm.asyncio import tqdm_asyncio
 import concurrent.futures
 from queue import Queue
 from threading import Lock
@@ -17,13 +15,14 @@ import sys
 import os
 from selenium import webdriver
 from dotenv import load_dotenv
-from typing import List
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 
 from settings import logger
+from transaction_store import TransactionStore
+from proxy_validator import ProxyValidator
 
 def setup_chrome_driver(download_dir: str, proxy: str = None) -> webdriver.Chrome:
     chrome_options = Options()
@@ -59,7 +58,8 @@ class EtherscanScrapperManager:
         num_workers: int,
         download_dir: str = "exports",
         cache_file: str = "cache.json",
-        proxies: List[Tuple[str, float]] = []
+        proxies: List[Tuple[str, float]] = [],
+        store: Optional[TransactionStore] = None
     ):
         self.addresses = addresses
         self.num_workers = num_workers
@@ -69,6 +69,7 @@ class EtherscanScrapperManager:
         self.queue = Queue()
         self.lock = Lock()
         self.proxies = proxies if proxies else [None] * num_workers
+        self.store = store
 
         # Заполняем очередь задачами
         for address in addresses:
@@ -114,7 +115,7 @@ class EtherscanScrapperManager:
 
         # Инициализируем Chrome и Scrapper
         driver = setup_chrome_driver(worker_download_dir, proxy=proxy)
-        scrapper = EtherscanScrapper(driver, download_dir=worker_download_dir, timeout=timeout)
+        scrapper = EtherscanScrapper(driver, download_dir=worker_download_dir, timeout=timeout, store=self.store)
 
         while not self.queue.empty():
             try:
@@ -124,8 +125,9 @@ class EtherscanScrapperManager:
                         break
                     hex_address = self.queue.get()
 
-                # Проверяем, есть ли адрес в кэше
-                if hex_address in self.cache_list:
+                # Проверяем, есть ли адрес в кэше. С хранилищем транзакций адрес
+                # синхронизируется повторно: скачиваются только новые страницы
+                if self.store is None and hex_address in self.cache_list:
                     logger.info(f"Address {hex_address} is already cached. Skipping...")
                     self.progress_bar.update(1)
                     continue
@@ -136,7 +138,8 @@ class EtherscanScrapperManager:
                 # Если успешно обработано, добавляем в кэш
                 if result[hex_address]["status"] in ("success", "already_exists"):
                     with self.lock:
-                        self.cache_list.append(hex_address)
+                        if hex_address not in self.cache_list:
+                            self.cache_list.append(hex_address)
                     # Обновляем прогресс
                     self.progress_bar.update(1)
             except Exception as e:
@@ -165,10 +168,11 @@ class EtherscanScrapperManager:
         self.save_cache()
 
 class EtherscanScrapper:
-    def __init__(self, driver, download_dir: str, timeout: int):
+    def __init__(self, driver, download_dir: str, timeout: int, store: Optional[TransactionStore] = None):
         self.driver = driver
         self.download_dir = download_dir
         self.timeout = timeout  # Таймаут для WebDriverWait
+        self.store = store  # Хранилище для инкрементальной синхронизации
         logger.info(f"Initialized EtherscanScrapper with download directory: {self.download_dir}")
         logger.info(f"Token: {os.getenv('YADISK_TOKEN')}")
         self.yadisk = yadisk.Client(token=os.getenv('YADISK_TOKEN'))
@@ -185,7 +189,7 @@ class EtherscanScrapper:
         try:
             # Проверяем, существует ли файл на Яндекс.Диске
             yadisk_path = f"/exports/{hex_address}_transactions.csv"
-            if self.yadisk.exists(yadisk_path):
+            if self.store is None and self.yadisk.exists(yadisk_path):
                 logger.info(f"File for user {hex_address} already exists on Yandex.Disk. Skipping...")
                 scrapped_info[hex_address]["status"] = "already_exists"
                 return scrapped_info
@@ -202,6 +206,11 @@ class EtherscanScrapper:
             total_pages = int(total_pages_element.get_attribute("href").split("p=")[-1])
             logger.info(f"Total pages for {hex_address}: {total_pages}")
 
+            # Последний синхронизированный блок: страницы идут от новых транзакций
+            # к старым, поэтому обход останавливается на первой уже известной странице
+            last_block = self.store.get_last_block(hex_address) if self.store else None
+            logger.info(f"Last synced block for {hex_address}: {last_block}")
+
             # Счётчик ошибок для текущего адреса
             error_count = 0
             threshold = total_pages // 3
@@ -221,7 +230,11 @@ class EtherscanScrapper:
                     logger.info(f"Clicked export button for address: {hex_address}")
                     
                     # Ожидание завершения скачивания файла
-                    self._wait_for_download(hex_address, page=page)
+                    page_file = self._wait_for_download(hex_address, page=page)
+
+                    if last_block is not None and self._reached_synced_block(page_file, last_block):
+                        logger.info(f"Page {page} for {hex_address} reached synced block {last_block}. Stopping.")
+                        break
                 except Exception as e:
                     error_count += 1
                     logger.info(f"An error occurred on page {page} for address {hex_address}: {e}")
@@ -235,7 +248,7 @@ class EtherscanScrapper:
 
             # Если ошибок меньше порога, считаем обработку успешной
             if error_count <= threshold:
-                result = self.merge_csv_by_user(hex_address)
+                result = self.merge_csv_by_user(hex_address, complete=error_count == 0)
                 if (result):
                     scrapped_info[hex_address]["status"] = "success"
                     scrapped_info[hex_address]["errors"] = error_count
@@ -248,11 +261,12 @@ class EtherscanScrapper:
 
         return scrapped_info
 
-    def merge_csv_by_user(self, hex_address: str) -> bool:
+    def merge_csv_by_user(self, hex_address: str, complete: bool = True) -> bool:
         """
         Объединяет все CSV-файлы для конкретного пользователя в один CSV-файл и удаляет исходные файлы.
 
         :param hex_address: HEX-адрес пользователя
+        :param complete: Скачаны ли все страницы без ошибок (см. TransactionStore.ingest)
         """
         # Ищем все файлы, относящиеся к данному пользователю
         user_files = glob.glob(os.path.join(self.download_dir, f"{hex_address}_transactions_*.csv"))
@@ -268,7 +282,17 @@ class EtherscanScrapper:
         
         # Сохраняем объединённый файл
         output_file = os.path.join(self.download_dir, f"{hex_address}_transactions.csv")
-        combined_df.to_csv(output_file, index=False)
+        if self.store is not None:
+            # Новые транзакции добавляются в хранилище без дубликатов,
+            # а на Яндекс.Диск выгружается полная история адреса
+            self.store.ingest(combined_df, hex_address, complete=complete)
+            if not self.store.needs_upload(hex_address):
+                logger.info(f"File for user {hex_address} on Yandex.Disk is up to date. Skipping upload.")
+                self._remove_files(user_files)
+                return True
+            row_count = self.store.export_address(hex_address, output_file)
+        else:
+            combined_df.to_csv(output_file, index=False)
         logger.info(f"CSV files for user {hex_address} have been merged into {output_file}.")
         # Load to yadisk
 
@@ -276,6 +300,8 @@ class EtherscanScrapper:
         yadisk_path = f"/exports/{hex_address}_transactions.csv"
         try:
             self.yadisk.upload(output_file, yadisk_path, overwrite=True)
+            if self.store is not None:
+                self.store.mark_uploaded(hex_address, row_count)
             os.remove(output_file)  # Удаляем локальный файл после загрузки
             logger.info(f"File {output_file} has been uploaded to Yandex.Disk at {yadisk_path}.")
         except Exception as e:
@@ -283,19 +309,28 @@ class EtherscanScrapper:
             return False
 
         # Удаляем исходные файлы
-        for file_path in user_files:
+        self._remove_files(user_files)
+        return True
+
+    def _remove_files(self, file_paths: List[str]):
+        """
+        Удаляет скачанные страницы экспорта.
+
+        :param file_paths: Пути к файлам
+        """
+        for file_path in file_paths:
             try:
                 os.remove(file_path)
             except OSError as e:
                 logger.info(f"Error deleting file {file_path}: {e}")
-        return True
 
-    def _wait_for_download(self, hex_address: str, page = 1, timeout: int = 30):
+    def _wait_for_download(self, hex_address: str, page = 1, timeout: int = 30) -> str:
         """
         Ожидает завершения скачивания файла в указанной директории.
 
         :param hex_address: HEX-адрес для проверки имени файла
         :param timeout: Максимальное время ожидания в секундах
+        :return: Путь к переименованному файлу страницы
         """
         start_time = time.time()
         downloaded_file = None
@@ -317,37 +352,31 @@ class EtherscanScrapper:
             time.sleep(1e-2)
         time.sleep(0.5)
         # Переименование файла
-        if downloaded_file:
-            new_file_name = f"{hex_address}_transactions_{page}.csv"
-            new_path = os.path.join(self.download_dir, new_file_name)
-            os.rename(downloaded_file, new_path)
-            logger.info(f"File renamed to: {new_file_name}")
+        new_file_name = f"{hex_address}_transactions_{page}.csv"
+        new_path = os.path.join(self.download_dir, new_file_name)
+        os.rename(downloaded_file, new_path)
+        logger.info(f"File renamed to: {new_file_name}")
+        return new_path
 
-async def check_proxy(session: aiohttp.ClientSession, proxy: str, test_url: str, timeout: int) -> Optional[Tuple[str, float]]:
-    """
-    Проверяет доступность прокси и измеряет время отклика.
+    def _reached_synced_block(self, page_file: str, last_block: int) -> bool:
+        """
+        Проверяет, содержит ли страница экспорта уже синхронизированные транзакции.
 
-    :param session: Асинхронная сессия aiohttp.
-    :param proxy: Прокси-сервер для проверки.
-    :param test_url: URL для проверки доступности.
-    :return: Кортеж (прокси, время отклика) или None, если прокси недоступен.
-    """
-    try:
-        start_time = asyncio.get_event_loop().time()
-        async with session.get(test_url, proxy=proxy, timeout=timeout) as response:
-            latency = asyncio.get_event_loop().time() - start_time
-            if response.status == 200:
-                return proxy, latency
-    except Exception as e:
-        logger.info(f"Proxy {proxy} failed. Exception: {e}")
-    return None
+        :param page_file: Путь к CSV-файлу страницы
+        :param last_block: Последний синхронизированный блок адреса
+        :return: True, если дальнейшие страницы скачивать не нужно
+        """
+        blocks = pd.read_csv(page_file, usecols=['Blockno'])['Blockno']
+        return blocks.empty or blocks.min() <= last_block
 
 async def fetch_proxies_async(
     proxy_file: str = "https.txt",
     num_proxies: int = 8,
     test_url: str = "https://etherscan.io/",
     max_retries: int = 3,
-    initial_timeout: int = 3
+    initial_timeout: int = 3,
+    cache_file: str = "proxy_cache.json",
+    concurrency: int = 64
 ) -> List[Tuple[str, float]]:
     """
     Загружает список актуальных HTTP-прокси, проверяет их доступность и возвращает N самых быстрых.
@@ -357,6 +386,8 @@ async def fetch_proxies_async(
     :param test_url: URL для проверки доступности прокси.
     :param max_retries: Максимальное количество повторных попыток.
     :param initial_timeout: Начальный таймаут для проверки прокси.
+    :param cache_file: Файл с результатами прошлых проверок.
+    :param concurrency: Максимальное количество одновременных проверок.
     :return: Список рабочих и быстрых прокси-серверов.
     """
     try:
@@ -366,45 +397,16 @@ async def fetch_proxies_async(
         
         # Читаем прокси из файла
         with open(proxy_file, "r") as f:
-            proxies = {line.strip() for line in f if line.strip()}
+            proxies = [line.strip() for line in f if line.strip()]
         logger.info(f"Loaded {len(proxies)} proxies.")
-        logger.info(proxies)
-
-        retry_count = 0
-        timeout = initial_timeout
-        working_proxies = []        
-
-        while retry_count <= max_retries:
-            logger.info(f"Attempt {retry_count + 1} with timeout {timeout}s")
-            # Проверяем доступность прокси
-            # Создаём асинхронную сессию
-            async with aiohttp.ClientSession(headers={"User-Agent": "curl/8.7.1"}) as session:
-                tasks = [
-                    check_proxy(session, proxy, test_url, timeout)
-                    for proxy in proxies
-                ]
-                results = await tqdm_asyncio.gather(*tasks, desc="Checking proxies")
-
-            # Фильтруем рабочие прокси
-            working_proxies = [result for result in results if result is not None]
-            logger.info(f"Working proxies: {working_proxies}")
-            logger.info(f"Count: {len(working_proxies)}")
-
-            # Если найдено достаточно прокси, возвращаем их
-            if len(working_proxies) >= num_proxies:
-                working_proxies.sort(key=lambda x: x[1])
-                fastest_proxies = working_proxies[:num_proxies]
-                logger.info(f"Selected {len(fastest_proxies)} fastest proxies.")
-                return fastest_proxies
-
-            # Увеличиваем таймаут и делаем повторную попытку
-            retry_count += 1
-            timeout *= 2  # Увеличиваем таймаут в 2 раза
-
-        # Если после всех попыток не удалось найти достаточно прокси
-        logger.info("Max retries reached. Returning available proxies.")
-        working_proxies.sort(key=lambda x: x[1])
-        return working_proxies
+
+        validator = ProxyValidator(test_url=test_url, cache_file=cache_file, concurrency=concurrency)
+        return await validator.validate(
+            proxies,
+            num_proxies=num_proxies,
+            max_retries=max_retries,
+            initial_timeout=initial_timeout
+        )
 
     except Exception as e:
         logger.info(f"Failed to fetch proxies: {e}")
@@ -430,6 +432,8 @@ def onExit(manager: EtherscanScrapperManager):
     Выполняется при выходе из программы. Сохраняет кэш и удаляет все файлы и папки внутри exports.
     """
     manager.save_cache()
+    if manager.store is not None:
+        manager.store.close()
 
     # Удаляем все файлы и папки внутри exports
     try:
@@ -458,7 +462,8 @@ def main():
         addresses = addresses,
         num_workers = num_workers,
         download_dir = download_dir,
-        proxies=proxies
+        proxies=proxies,
+        store=TransactionStore("transactions.db")
     )
     atexit.register(onExit, manager)
     manager.run()
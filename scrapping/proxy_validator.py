@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import aiohttp
+import asyncio
+import statistics
+from tqdm import tqdm
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from settings import logger
+
+# Результат measure для прокси, не ответившего за таймаут. Только такие прокси
+# перепроверяются с увеличенным таймаутом; остальные ошибки окончательны
+TIMED_OUT = float("inf")
+
+
+class ProxyValidator:
+    """
+    Проверяет прокси с ограниченной параллельностью и останавливается, как только
+    подтверждено нужное количество рабочих прокси.
+
+    Результаты проверок кэшируются на диске с отметкой времени: при перезапуске
+    повторно проверяются только устаревшие записи.
+    """
+
+    def __init__(
+        self,
+        test_url: str = "https://etherscan.io/",
+        cache_file: str = "proxy_cache.json",
+        concurrency: int = 64,
+        probes: int = 3,
+        cache_ttl: float = 3600.0
+    ):
+        self.test_url = test_url
+        self.cache_file = cache_file
+        self.concurrency = concurrency  # Максимум одновременных проверок и соединений
+        self.probes = probes  # Количество замеров задержки на прокси
+        self.cache_ttl = cache_ttl  # Время жизни записи кэша в секундах
+        self.cache: Dict[str, dict] = self.load_cache()
+
+    def load_cache(self) -> Dict[str, dict]:
+        """
+        Загружает результаты прошлых проверок из файла.
+        """
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, "r") as f:
+                return json.load(f).get("proxies", {})
+        except (OSError, ValueError) as e:
+            logger.info(f"Failed to read proxy cache {self.cache_file}: {e}")
+            return {}
+
+    def save_cache(self):
+        """
+        Сохраняет результаты проверок в файл.
+        """
+        with open(self.cache_file, "w") as f:
+            json.dump({"proxies": self.cache}, f)
+
+    def is_fresh(self, proxy: str) -> bool:
+        entry = self.cache.get(proxy)
+        return entry is not None and time.time() - entry["checked_at"] < self.cache_ttl
+
+    async def measure(self, session: aiohttp.ClientSession, proxy: str, timeout: float) -> Optional[float]:
+        """
+        Измеряет задержку прокси по нескольким запросам.
+
+        :param session: Асинхронная сессия aiohttp.
+        :param proxy: Прокси-сервер для проверки.
+        :param timeout: Таймаут одного запроса в секундах.
+        :return: Медианная задержка, TIMED_OUT, если запрос не уложился в таймаут,
+            или None при любой другой ошибке.
+        """
+        latencies = []
+        loop = asyncio.get_running_loop()
+        for _ in range(self.probes):
+            try:
+                start_time = loop.time()
+                async with session.get(
+                    self.test_url, proxy=proxy, timeout=aiohttp.ClientTimeout(total=timeout)
+                ) as response:
+                    if response.status != 200:
+                        return None
+                    latencies.append(loop.time() - start_time)
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                logger.info(f"Proxy {proxy} timed out after {timeout}s.")
+                return TIMED_OUT
+            except Exception as e:
+                logger.info(f"Proxy {proxy} failed. Exception: {e}")
+                return None
+        return statistics.median(latencies)
+
+    async def _check_batch(
+        self,
+        session: aiohttp.ClientSession,
+        proxies: List[str],
+        timeout: float,
+        confirmed: Dict[str, float],
+        num_proxies: int
+    ) -> List[str]:
+        """
+        Проверяет прокси пулом из self.concurrency воркеров и отменяет оставшиеся
+        проверки, как только подтверждено num_proxies прокси.
+
+        :return: Список прокси, не ответивших за таймаут.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for proxy in proxies:
+            queue.put_nowait(proxy)
+        timed_out: List[str] = []
+        enough = asyncio.Event()
+        progress_bar = tqdm(total=len(proxies), desc="Checking proxies", unit="proxy")
+
+        async def worker():
+            while not queue.empty():
+                proxy = queue.get_nowait()
+                latency = await self.measure(session, proxy, timeout)
+                progress_bar.update(1)
+                if latency is None or latency == TIMED_OUT:
+                    self.cache[proxy] = {"latency": None, "checked_at": time.time()}
+                    if latency == TIMED_OUT:
+                        timed_out.append(proxy)
+                    continue
+                self.cache[proxy] = {"latency": latency, "checked_at": time.time()}
+                confirmed[proxy] = latency
+                if len(confirmed) >= num_proxies:
+                    enough.set()
+                    return
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, len(proxies)))]
+        all_done = asyncio.ensure_future(asyncio.gather(*workers))
+        enough_wait = asyncio.ensure_future(enough.wait())
+        await asyncio.wait([all_done, enough_wait], return_when=asyncio.FIRST_COMPLETED)
+
+        # Прерываем проверки, которые ещё не завершились
+        for task in workers:
+            task.cancel()
+        enough_wait.cancel()
+        await asyncio.gather(all_done, enough_wait, return_exceptions=True)
+        progress_bar.close()
+        return timed_out
+
+    async def validate(
+        self,
+        proxies: Iterable[str],
+        num_proxies: int = 8,
+        max_retries: int = 3,
+        initial_timeout: float = 3.0
+    ) -> List[Tuple[str, float]]:
+        """
+        Возвращает до num_proxies подтверждённых прокси, отсортированных по задержке.
+
+        Свежие записи кэша используются без повторной проверки. Прокси, не ответившие
+        за таймаут, перепроверяются с удвоенным таймаутом, пока рабочих прокси не хватает;
+        прокси с другими ошибками (отказ в соединении, статус не 200) не перепроверяются.
+
+        Проверка останавливается, как только подтверждено num_proxies прокси, поэтому
+        возвращаются первые прошедшие проверку прокси, отсортированные по задержке,
+        а не самые быстрые из всего списка. Непроверенные прокси могут быть быстрее.
+
+        :param proxies: Прокси-серверы для проверки.
+        :param num_proxies: Количество прокси, которые нужно вернуть.
+        :param max_retries: Максимальное количество повторных попыток.
+        :param initial_timeout: Начальный таймаут для проверки прокси.
+        :return: Список кортежей (прокси, задержка).
+        """
+        proxies = list(dict.fromkeys(proxies))
+        confirmed = {
+            proxy: self.cache[proxy]["latency"]
+            for proxy in proxies
+            if self.is_fresh(proxy) and self.cache[proxy]["latency"] is not None
+        }
+        pending = [proxy for proxy in proxies if not self.is_fresh(proxy)]
+        logger.info(f"{len(confirmed)} proxies confirmed from cache, {len(pending)} stale or unchecked.")
+
+        timeout = initial_timeout
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        async with aiohttp.ClientSession(connector=connector, headers={"User-Agent": "curl/8.7.1"}) as session:
+            for attempt in range(max_retries + 1):
+                if len(confirmed) >= num_proxies or not pending:
+                    break
+                logger.info(f"Attempt {attempt + 1} with timeout {timeout}s for {len(pending)} proxies")
+                pending = await self._check_batch(session, pending, timeout, confirmed, num_proxies)
+                logger.info(f"Confirmed proxies: {len(confirmed)}")
+                timeout *= 2  # Увеличиваем таймаут в 2 раза только для не ответивших прокси
+
+        self.save_cache()
+        if len(confirmed) < num_proxies:
+            logger.info("Max retries reached. Returning available proxies.")
+        fastest_proxies = sorted(confirmed.items(), key=lambda x: x[1])[:num_proxies]
+        logger.info(f"Selected {len(fastest_proxies)} fastest proxies.")
+        return fastest_proxies
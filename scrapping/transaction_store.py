@@ -0,0 +1,283 @@
+import sqlite3
+import pandas as pd
+from threading import Lock
+from typing import Iterable, List, Optional
+
+from settings import logger
+
+# Соответствие колонок экспорта Etherscan колонкам нормализованной схемы.
+# Etherscan в разное время отдавал хэш как 'Txhash' и как 'Transaction Hash'.
+EXPORT_COLUMNS = {
+    'Txhash': 'txhash',
+    'Transaction Hash': 'txhash',
+    'Blockno': 'block',
+    'UnixTimestamp': 'timestamp',
+    'From': 'from_address',
+    'To': 'to_address',
+    'ContractAddress': 'contract_address',
+    'Value_IN(ETH)': 'value_in',
+    'Value_OUT(ETH)': 'value_out',
+    'TxnFee(ETH)': 'fee',
+    'TxnFee(USD)': 'fee_usd',
+    'Historical $Price/Eth': 'historical_price',
+    'Status': 'status',
+    'ErrCode': 'err_code',
+    'Method': 'method',
+}
+
+STORE_COLUMNS = [
+    'txhash', 'address', 'block', 'timestamp', 'from_address', 'to_address', 'contract_address',
+    'value_in', 'value_out', 'fee', 'fee_usd', 'historical_price', 'status', 'err_code', 'method',
+]
+
+# Колонки файла, выгружаемого на Яндекс.Диск, в порядке экспорта Etherscan.
+# Колонки 'CurrentValue @ $.../Eth' не хранятся (см. normalize_export) и не выгружаются.
+ETHERSCAN_EXPORT_COLUMNS = [
+    'Transaction Hash', 'Blockno', 'UnixTimestamp', 'DateTime (UTC)', 'From', 'To',
+    'ContractAddress', 'Value_IN(ETH)', 'Value_OUT(ETH)', 'TxnFee(ETH)', 'TxnFee(USD)',
+    'Historical $Price/Eth', 'Status', 'ErrCode', 'Method',
+]
+
+SQL_CHUNK_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    txhash TEXT NOT NULL,
+    address TEXT NOT NULL,
+    block INTEGER NOT NULL,
+    timestamp INTEGER,
+    from_address TEXT,
+    to_address TEXT,
+    contract_address TEXT,
+    value_in REAL,
+    value_out REAL,
+    fee REAL,
+    fee_usd REAL,
+    historical_price REAL,
+    status TEXT,
+    err_code TEXT,
+    method TEXT,
+    PRIMARY KEY (txhash, address)
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_address_block ON transactions (address, block);
+CREATE TABLE IF NOT EXISTS sync_state (
+    address TEXT PRIMARY KEY,
+    last_block INTEGER NOT NULL,
+    synced_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS uploads (
+    address TEXT PRIMARY KEY,
+    row_count INTEGER NOT NULL,
+    uploaded_at INTEGER NOT NULL
+);
+"""
+
+
+def normalize_export(data: pd.DataFrame, hex_address: str) -> pd.DataFrame:
+    """
+    Приводит CSV-экспорт Etherscan к нормализованной схеме и убирает дубликаты.
+
+    Колонки вида 'CurrentValue @ $.../Eth' отбрасываются: они зависят от курса
+    на момент скачивания и различаются от страницы к странице.
+
+    :param data: DataFrame с одной или несколькими страницами экспорта
+    :param hex_address: HEX-адрес пользователя, для которого скачан экспорт
+    :return: DataFrame с колонками STORE_COLUMNS без повторов по txhash
+    """
+    data = data.rename(columns=EXPORT_COLUMNS)
+    if 'txhash' not in data.columns or 'block' not in data.columns:
+        raise ValueError("Не найдены необходимые колонки в экспорте.")
+
+    data = data.reindex(columns=STORE_COLUMNS)
+    data['address'] = hex_address.lower()
+    data = data.dropna(subset=['txhash', 'block'])
+    data['block'] = data['block'].astype('int64')
+    data['timestamp'] = pd.to_numeric(data['timestamp'], errors='coerce').astype('Int64')
+    for column in ('txhash', 'from_address', 'to_address', 'contract_address'):
+        data[column] = data[column].astype('string').str.lower()
+
+    # Соседние страницы пересекаются, если за время обхода появились новые транзакции
+    return data.drop_duplicates(subset=['txhash'], keep='first').reset_index(drop=True)
+
+
+def to_etherscan_export(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Преобразует транзакции из схемы хранилища обратно в колонки экспорта Etherscan,
+    чтобы выгружаемые файлы читались как раньше (read_addresses_from_csv, ноутбуки).
+
+    :param data: DataFrame с колонками STORE_COLUMNS
+    :return: DataFrame с колонками ETHERSCAN_EXPORT_COLUMNS
+    """
+    columns = {store: export for export, store in EXPORT_COLUMNS.items() if export != 'Txhash'}
+    export = data.rename(columns=columns)
+    export['DateTime (UTC)'] = pd.to_datetime(
+        export['UnixTimestamp'], unit='s', errors='coerce'
+    ).dt.strftime('%Y-%m-%d %H:%M:%S')
+    return export.reindex(columns=ETHERSCAN_EXPORT_COLUMNS)
+
+
+class TransactionStore:
+    """
+    Хранилище нормализованных транзакций на SQLite с ключом (txhash, address).
+
+    Для каждого адреса запоминается максимальный загруженный блок, чтобы повторный
+    парсинг скачивал только новые транзакции.
+    """
+
+    def __init__(self, db_path: str = "transactions.db"):
+        self.db_path = db_path
+        self.lock = Lock()
+        # Соединение разделяется воркерами EtherscanScrapperManager, доступ под self.lock
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+        logger.info(f"Transaction store opened at {self.db_path}")
+
+    def get_last_block(self, hex_address: str) -> Optional[int]:
+        """
+        Возвращает максимальный синхронизированный блок для адреса.
+
+        :param hex_address: HEX-адрес пользователя
+        :return: Номер блока или None, если адрес ещё не синхронизировался
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT last_block FROM sync_state WHERE address = ?",
+                (hex_address.lower(),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def ingest(self, data: pd.DataFrame, hex_address: str, complete: bool = True) -> int:
+        """
+        Нормализует экспорт и добавляет в хранилище только новые транзакции.
+
+        :param data: DataFrame с одной или несколькими страницами экспорта
+        :param hex_address: HEX-адрес пользователя
+        :param complete: Скачаны ли все страницы до точки остановки. Если часть страниц
+            не скачалась, транзакции сохраняются, но last_block не сдвигается, чтобы
+            следующая синхронизация снова дошла до пропущенных страниц
+        :return: Количество добавленных транзакций
+        """
+        hex_address = hex_address.lower()
+        normalized = normalize_export(data, hex_address)
+        last_block = self.get_last_block(hex_address)
+        if last_block is not None:
+            # Транзакции из последнего блока могли быть загружены не полностью,
+            # поэтому блок last_block проверяется повторно, а дубликаты отсекает ключ
+            normalized = normalized[normalized['block'] >= last_block]
+
+        rows = normalized.astype(object).where(normalized.notna(), None)
+        records = list(rows.itertuples(index=False, name=None))
+
+        with self.lock, self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(
+                f"INSERT OR IGNORE INTO transactions ({', '.join(STORE_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(STORE_COLUMNS))})",
+                records
+            )
+            inserted = self.connection.total_changes - before
+            if complete and not normalized.empty:
+                max_block = int(normalized['block'].max())
+                self.connection.execute(
+                    "INSERT INTO sync_state (address, last_block, synced_at) "
+                    "VALUES (?, ?, strftime('%s', 'now')) "
+                    "ON CONFLICT(address) DO UPDATE SET "
+                    "last_block = MAX(last_block, excluded.last_block), "
+                    "synced_at = excluded.synced_at",
+                    (hex_address, max_block)
+                )
+
+        logger.info(f"Ingested {inserted} new transactions for {hex_address} "
+                    f"({len(normalized)} rows after deduplication).")
+        return inserted
+
+    def read_transactions(
+        self,
+        addresses: Optional[Iterable[str]] = None,
+        columns: Optional[List[str]] = None,
+        ordered: bool = True
+    ) -> pd.DataFrame:
+        """
+        Читает транзакции из хранилища.
+
+        :param addresses: Адреса пользователей; если не указаны, читаются все транзакции
+        :param columns: Колонки из STORE_COLUMNS; по умолчанию читаются все
+        :param ordered: Сортировать ли по адресу и блоку. Без сортировки и с нужными
+            колонками чтение всего корпуса в несколько раз быстрее
+        :return: DataFrame с колонками columns
+        """
+        columns = list(columns or STORE_COLUMNS)
+        unknown = set(columns) - set(STORE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Неизвестные колонки: {', '.join(sorted(unknown))}")
+
+        query = f"SELECT {', '.join(columns)} FROM transactions"
+        order_by = " ORDER BY address, block" if ordered else ""
+        if addresses is None:
+            with self.lock:
+                return pd.read_sql_query(query + order_by, self.connection)
+
+        # SQLite ограничивает число параметров запроса, поэтому адреса читаются пачками
+        addresses = sorted({address.lower() for address in addresses})
+        chunks: List[pd.DataFrame] = []
+        for start in range(0, len(addresses), SQL_CHUNK_SIZE):
+            params = addresses[start:start + SQL_CHUNK_SIZE]
+            chunk_query = f"{query} WHERE address IN ({', '.join('?' * len(params))}){order_by}"
+            with self.lock:
+                chunks.append(pd.read_sql_query(chunk_query, self.connection, params=params))
+        if not chunks:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(chunks, ignore_index=True)
+
+    def needs_upload(self, hex_address: str) -> bool:
+        """
+        Проверяет, отличается ли история адреса в хранилище от выгруженной на Яндекс.Диск.
+
+        Сравнивается количество транзакций, а не last_block: после неудачной выгрузки
+        или дозагрузки пропущенных страниц last_block может не измениться.
+
+        :param hex_address: HEX-адрес пользователя
+        :return: True, если файл на Яндекс.Диске отсутствует или устарел
+        """
+        hex_address = hex_address.lower()
+        with self.lock:
+            stored = self.connection.execute(
+                "SELECT COUNT(*) FROM transactions WHERE address = ?", (hex_address,)
+            ).fetchone()[0]
+            uploaded = self.connection.execute(
+                "SELECT row_count FROM uploads WHERE address = ?", (hex_address,)
+            ).fetchone()
+        return uploaded is None or uploaded[0] != stored
+
+    def mark_uploaded(self, hex_address: str, row_count: int):
+        """
+        Запоминает количество транзакций в успешно выгруженном файле.
+
+        :param hex_address: HEX-адрес пользователя
+        :param row_count: Количество транзакций в выгруженном файле
+        """
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO uploads (address, row_count, uploaded_at) "
+                "VALUES (?, ?, strftime('%s', 'now')) "
+                "ON CONFLICT(address) DO UPDATE SET "
+                "row_count = excluded.row_count, uploaded_at = excluded.uploaded_at",
+                (hex_address.lower(), row_count)
+            )
+
+    def export_address(self, hex_address: str, output_file: str) -> int:
+        """
+        Сохраняет полную историю транзакций адреса в CSV-файл с колонками экспорта Etherscan.
+
+        :param hex_address: HEX-адрес пользователя
+        :param output_file: Путь к CSV-файлу
+        :return: Количество сохранённых транзакций
+        """
+        data = self.read_transactions([hex_address])
+        to_etherscan_export(data).to_csv(output_file, index=False)
+        return len(data)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
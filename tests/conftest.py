@@ -0,0 +1,11 @@
+import os
+import sys
+import logging
+
+# Модули scrapping импортируются как скрипты (from settings import logger),
+# поэтому каталог scrapping добавляется в sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scrapping"))
+
+# settings.py настраивает запись лога в файл текущего каталога: в тестах
+# настраиваем логирование заранее, чтобы basicConfig в settings ничего не делал
+logging.basicConfig(handlers=[logging.NullHandler()])
@@ -0,0 +1,41 @@
+import pandas as pd
+
+from analytics import RANKING_COLUMNS, InteractionGraph, candidate_addresses, rank_contracts, rank_store_contracts
+from transaction_store import STORE_COLUMNS, TransactionStore
+
+
+def transactions(rows):
+    """Транзакции в схеме TransactionStore из кортежей (кошелёк, контракт, метод)."""
+    data = pd.DataFrame(rows, columns=['address', 'to_address', 'method'])
+    data['timestamp'] = 1700000000
+    return data.reindex(columns=STORE_COLUMNS)
+
+
+def test_rank_empty_store(tmp_path):
+    store = TransactionStore(str(tmp_path / "transactions.db"))
+    ranking = rank_store_contracts(store)
+    store.close()
+
+    assert ranking.empty
+    assert list(ranking.columns) == RANKING_COLUMNS
+    assert candidate_addresses(ranking) == set()
+
+
+def test_rank_orders_by_unique_wallets():
+    graph = InteractionGraph.from_transactions(transactions([
+        ('0xw1', '0xpopular', 'Swap'),
+        ('0xw2', '0xpopular', 'Swap'),
+        ('0xw3', '0xpopular', 'Deposit'),
+        ('0xw1', '0xbusy', 'Swap'),
+        ('0xw1', '0xbusy', 'Swap'),
+        ('0xw1', '0xbusy', 'Swap'),
+        ('0xw2', '0xignored', 'Approve'),
+    ]))
+    ranking = rank_contracts(graph)
+
+    assert ranking['contract'].tolist() == ['0xpopular', '0xbusy']
+    assert ranking['wallets'].tolist() == [3, 1]
+    assert ranking['transactions'].tolist() == [3, 3]
+    assert ranking.loc[0, 'top_method'] == 'Swap'
+    assert ranking.loc[0, 'co_used_with'] == ['0xbusy']
+    assert candidate_addresses(ranking, min_wallets=2) == {'0xpopular'}
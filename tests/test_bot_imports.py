@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Должно совпадать с FORBIDDEN_MODULES в benchmarks/bot_startup.py
+HEAVY_MODULES = ('pandas', 'numpy', 'selenium', 'yadisk')
+
+
+def test_bot_does_not_import_heavy_modules(tmp_path):
+    code = (
+        "import sys\n"
+        "import bot\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    # Отдельный интерпретатор: в процессе pytest pandas уже импортирован другими тестами;
+    # tmp_path как рабочий каталог, чтобы settings.py не создал bot.log в репозитории
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path, env=dict(os.environ, PYTHONPATH=REPO_ROOT),
+        capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == ""
@@ -0,0 +1,75 @@
+import os
+
+import pandas as pd
+import pytest
+
+from etherscan_scrapper import EtherscanScrapper
+from transaction_store import ETHERSCAN_EXPORT_COLUMNS, TransactionStore
+
+WALLET = "0x38153bad797c27dd07cb04b89326bbfde3f7f0c5"
+
+
+class FlakyDisk:
+    """Клиент Яндекс.Диска, у которого первые failures выгрузок заканчиваются ошибкой."""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.uploads = []
+
+    def upload(self, local_path, remote_path, overwrite=False):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("upload failed")
+        self.uploads.append((remote_path, pd.read_csv(local_path)))
+
+
+@pytest.fixture
+def scrapper(tmp_path):
+    store = TransactionStore(str(tmp_path / "transactions.db"))
+    scrapper = EtherscanScrapper.__new__(EtherscanScrapper)
+    scrapper.download_dir = str(tmp_path)
+    scrapper.store = store
+    scrapper.yadisk = FlakyDisk(failures=1)
+    yield scrapper
+    store.close()
+
+
+def download_page(scrapper, page, blocks):
+    pd.DataFrame({
+        "Transaction Hash": [f"0xhash{block}" for block in blocks],
+        "Blockno": blocks,
+        "UnixTimestamp": [1704830495 + block for block in blocks],
+        "From": [WALLET] * len(blocks),
+        "To": ["0x514910771af9ca656af840dff83e8264ecf986ca"] * len(blocks),
+        "TxnFee(USD)": [0.75] * len(blocks),
+        "Method": ["Transfer"] * len(blocks),
+    }).to_csv(os.path.join(scrapper.download_dir, f"{WALLET}_transactions_{page}.csv"), index=False)
+
+
+def test_failed_upload_is_retried_on_resync(scrapper):
+    download_page(scrapper, 1, [3, 2, 1])
+    assert scrapper.merge_csv_by_user(WALLET) is False
+    assert scrapper.store.get_last_block(WALLET) == 3
+
+    # Повторная синхронизация не находит новых транзакций, но файл на диске отсутствует
+    download_page(scrapper, 1, [3, 2, 1])
+    assert scrapper.merge_csv_by_user(WALLET) is True
+    assert len(scrapper.yadisk.uploads) == 1
+
+    # Теперь файл актуален: без новых транзакций выгрузка пропускается
+    download_page(scrapper, 1, [3, 2, 1])
+    assert scrapper.merge_csv_by_user(WALLET) is True
+    assert len(scrapper.yadisk.uploads) == 1
+
+
+def test_uploaded_file_keeps_etherscan_columns(scrapper):
+    scrapper.yadisk.failures = 0
+    download_page(scrapper, 1, [3, 2, 1])
+    assert scrapper.merge_csv_by_user(WALLET) is True
+
+    remote_path, uploaded = scrapper.yadisk.uploads[0]
+    assert remote_path == f"/exports/{WALLET}_transactions.csv"
+    assert list(uploaded.columns) == ETHERSCAN_EXPORT_COLUMNS
+    assert uploaded["Blockno"].tolist() == [1, 2, 3]
+    assert uploaded.loc[0, "DateTime (UTC)"] == "2024-01-09 20:01:36"
+    assert uploaded.loc[0, "TxnFee(USD)"] == 0.75
@@ -0,0 +1,64 @@
+import asyncio
+
+from aiohttp import web
+
+from proxy_validator import ProxyValidator
+
+
+async def start_proxy(delay: float):
+    """Локальный HTTP-сервер, отвечающий на любой запрос как прокси с задержкой delay."""
+    async def handle(request):
+        await asyncio.sleep(delay)
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_route("GET", "/{tail:.*}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_only_timed_out_proxies_are_retried(tmp_path):
+    async def scenario():
+        fast_runner, fast = await start_proxy(0.0)
+        slow_runner, slow = await start_proxy(0.3)
+        refused = "http://127.0.0.1:9"
+
+        validator = ProxyValidator(test_url="http://example.invalid/", cache_file=str(tmp_path / "cache.json"), probes=2)
+        checked = []
+        measure = validator.measure
+
+        async def recording_measure(session, proxy, timeout):
+            checked.append((proxy, timeout))
+            return await measure(session, proxy, timeout)
+
+        validator.measure = recording_measure
+        result = await validator.validate([fast, slow, refused], num_proxies=2, max_retries=2, initial_timeout=0.2)
+        await fast_runner.cleanup()
+        await slow_runner.cleanup()
+        return result, checked, fast, slow, refused
+
+    result, checked, fast, slow, refused = asyncio.run(scenario())
+
+    assert [proxy for proxy, _ in result] == [fast, slow]
+    assert [timeout for proxy, timeout in checked if proxy == slow] == [0.2, 0.4]
+    assert [timeout for proxy, timeout in checked if proxy == refused] == [0.2]
+
+
+def test_fresh_cache_entries_are_not_rechecked(tmp_path):
+    cache_file = str(tmp_path / "cache.json")
+
+    async def scenario():
+        runner, proxy = await start_proxy(0.0)
+        first = await ProxyValidator(test_url="http://example.invalid/", cache_file=cache_file).validate([proxy], num_proxies=1)
+        await runner.cleanup()
+        # Сервер остановлен: результат может прийти только из кэша
+        second = await ProxyValidator(test_url="http://example.invalid/", cache_file=cache_file).validate([proxy], num_proxies=1)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second
+    assert len(first) == 1
@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+from transaction_store import TransactionStore
+
+WALLET = "0x38153BAD797C27DD07CB04B89326BBFDE3F7F0C5"
+
+
+def export_page(blocks):
+    """Страница экспорта Etherscan: по одной транзакции на блок."""
+    return pd.DataFrame({
+        "Transaction Hash": [f"0xHASH{block}" for block in blocks],
+        "Blockno": blocks,
+        "UnixTimestamp": [1700000000 + block for block in blocks],
+        "From": [WALLET] * len(blocks),
+        "To": ["0xContract"] * len(blocks),
+        "Method": ["Transfer"] * len(blocks),
+        "CurrentValue @ $1804.41/Eth": [0.0] * len(blocks),
+    })
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TransactionStore(str(tmp_path / "transactions.db"))
+    yield store
+    store.close()
+
+
+def test_ingest_collapses_page_overlap(store):
+    pages = pd.concat([export_page([105, 104, 103]), export_page([103, 102, 101])])
+
+    assert store.ingest(pages, WALLET) == 5
+    assert store.get_last_block(WALLET) == 105
+
+    transactions = store.read_transactions([WALLET])
+    assert transactions["block"].tolist() == [101, 102, 103, 104, 105]
+    assert set(transactions["address"]) == {WALLET.lower()}
+    assert transactions["txhash"].is_unique
+
+
+def test_resync_inserts_only_new_transactions(store):
+    store.ingest(export_page([103, 102, 101]), WALLET)
+
+    assert store.ingest(export_page([103, 102]), WALLET) == 0
+    assert store.ingest(export_page([106, 105, 104, 103]), WALLET) == 3
+    assert store.get_last_block(WALLET) == 106
+    assert len(store.read_transactions([WALLET])) == 6
+
+
+def test_incomplete_sync_does_not_advance_last_block(store):
+    store.ingest(export_page([100, 99]), WALLET)
+
+    # Страницы 1 и 3 скачались, страница 2 (блоки 108-104) — нет
+    assert store.ingest(export_page([112, 111, 110, 109, 103, 102]), WALLET, complete=False) == 6
+    assert store.get_last_block(WALLET) == 100
+
+    # Повторная синхронизация доходит до пропущенной страницы и сдвигает last_block
+    pages = export_page([112, 111, 110, 109, 108, 107, 106, 105, 104, 103, 102, 101, 100])
+    assert store.ingest(pages, WALLET) == 6
+    assert store.get_last_block(WALLET) == 112
+    assert len(store.read_transactions([WALLET])) == 14
+
+
+def test_read_transactions_for_unknown_address(store):
+    assert store.read_transactions(["0xunknown"]).empty
+
+
+def test_read_transactions_selects_columns(store):
+    store.ingest(export_page([101, 102]), WALLET)
+
+    transactions = store.read_transactions(columns=["address", "to_address"], ordered=False)
+    assert list(transactions.columns) == ["address", "to_address"]
+    assert len(transactions) == 2
+
+    with pytest.raises(ValueError):
+        store.read_transactions(columns=["address; DROP TABLE transactions"])